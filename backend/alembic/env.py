@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import sys
 from logging.config import fileConfig
 from pathlib import Path
@@ -13,8 +14,10 @@ repo_root = Path(__file__).resolve().parents[2]
 # Ensure `import backend...` works when running Alembic from backend/
 if str(repo_root) not in sys.path:
     sys.path.insert(0, str(repo_root))
-load_dotenv(repo_root / "backend" / ".env")
-load_dotenv(repo_root / ".env")
+# Skip the .env reads when the URL is already provided (CI, containers, init_db)
+if not os.environ.get("DATABASE_URL"):
+    load_dotenv(repo_root / "backend" / ".env")
+    load_dotenv(repo_root / ".env")
 
 # Interpret the config file for Python logging.
 config = context.config
@@ -25,9 +28,11 @@ if config.config_file_name is not None:
 # Application imports: use app settings for DB URL and models metadata
 from backend.app.core.config import get_settings
 from backend.app.db.models import Base
+from backend.app.db.sqlite import apply_sqlite_pragmas
 
 target_metadata = Base.metadata
 
+
 def get_url() -> str:
     try:
         settings = get_settings()
@@ -59,6 +64,7 @@ def run_migrations_online() -> None:
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
+    apply_sqlite_pragmas(connectable)
 
     with connectable.connect() as connection:
         context.configure(connection=connection, target_metadata=target_metadata, compare_type=True)
@@ -0,0 +1,31 @@
+"""Indexes for thread history and recency listing
+
+Revision ID: 0002_history_indexes
+Revises: 0001_initial
+Create Date: 2026-10-16 00:00:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002_history_indexes"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves "messages of a thread in order" as an index range scan (no sort)
+    op.create_index("ix_messages_thread_created", "messages", ["thread_id", "created_at"])
+    # thread_id alone is a prefix of the composite index; drop the redundant one
+    op.drop_index("ix_messages_thread_id", table_name="messages")
+    # Sidebar lists threads by most recent activity
+    op.create_index("ix_threads_updated_at", "threads", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_threads_updated_at", table_name="threads")
+    op.create_index("ix_messages_thread_id", "messages", ["thread_id"])
+    op.drop_index("ix_messages_thread_created", table_name="messages")
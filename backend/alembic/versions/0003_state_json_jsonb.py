@@ -0,0 +1,46 @@
+"""Store threads.state_json as JSONB on Postgres
+
+Revision ID: 0003_state_json_jsonb
+Revises: 0002_history_indexes
+Create Date: 2026-10-16 00:00:00
+
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = "0003_state_json_jsonb"
+down_revision = "0002_history_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # JSONB is stored pre-parsed (no reparse on read) and supports GIN indexes.
+    # Other dialects keep the generic JSON type.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.alter_column(
+        "threads",
+        "state_json",
+        type_=JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=True,
+        postgresql_using="state_json::jsonb",
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.alter_column(
+        "threads",
+        "state_json",
+        type_=sa.JSON(),
+        existing_type=JSONB(),
+        existing_nullable=True,
+        postgresql_using="state_json::json",
+    )
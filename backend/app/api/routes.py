@@ -5,14 +5,19 @@ from __future__ import annotations
 Keeps routes minimal and defers logic to the LangGraph and memory layer.
 """
 
+import asyncio
+import codecs
 import contextlib
 import json
 import re
+import time
 import uuid
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator, Iterator
+from functools import lru_cache
+from typing import Any, Final
 
 from fastapi import APIRouter, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from backend.app.core.logging import get_logger
 from backend.app.core.models import ExplainRequest, Message, ThreadCreate, ThreadUpdate
@@ -23,12 +28,21 @@ from backend.app.services.cache import (
     cache_get_json,
     cache_set_json,
 )
-from backend.graph.state import initial_state
+
+try:  # Optional C JSON encoder for the thread endpoints
+    import orjson as _orjson
+except Exception:  # pragma: no cover
+    _orjson = None
+
+try:  # Optional linear-time regex engine (pyre2 / google-re2)
+    import re2 as _re2
+except Exception:  # pragma: no cover
+    _re2 = None
 
 logger = get_logger(__name__)
 
 # Swagger UI examples for /explain
-FIB_SNIPPET = '''
+FIB_SNIPPET: Final[str] = '''\
 def fib(n: int) -> int:
     """Return the n-th Fibonacci number (iterative)."""
     if n < 0:
@@ -36,29 +50,282 @@ def fib(n: int) -> int:
     a, b = 0, 1
     for _ in range(n):
         a, b = b, a + b
-    return a
-'''.strip()
+    return a'''
 
-ADD_SNIPPET_MSG = """
+ADD_SNIPPET_MSG: Final[str] = """\
 Please review this function and suggest improvements:
 
 ```python
 def add(a, b):
     # no type checks
     return a+b
-```
-""".strip()
+```"""
+
 router = APIRouter()
 
 
+class _FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when installed, stdlib json otherwise.
+
+    Thread payloads are returned as ready responses, skipping FastAPI's
+    Python-level jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if _orjson is None:  # pragma: no cover
+            return super().render(content)
+        return _orjson.dumps(content, option=_orjson.OPT_NON_STR_KEYS)
+
+
+# Recent messages considered for history and code extraction.
+_HISTORY_LIMIT = 20
+
+# Batch threshold for sse_paragraphs(): paragraph frames are joined until the
+# batch reaches this size (framed characters), so a typical report is one send.
+_PARAGRAPH_BATCH_BYTES = 16 * 1024
+
+# Coalescing window for bursty streams (seconds) and max frames per send.
+_COALESCE_WINDOW_S = 0.03
+_COALESCE_MAX_FRAMES = 16
+_STREAM_END = object()
+
+# Uploads are read and decoded in chunks of this size.
+_UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Fenced code block (```lang\n...```); compiled once at import. With RE2 the
+# match runs as an automaton, so time is linear in the input by construction.
+# RE2 has no lookaround, hence the plain lazy body there. The stdlib fallback
+# uses an unrolled loop that stops at the first closing fence without lazy
+# backtracking, so unterminated fences still scan in linear time.
+if _re2 is not None:  # pragma: no cover
+    _FENCE_RE = _re2.compile(r"```[a-zA-Z0-9_\-]*\n([\s\S]*?)```")
+else:
+    _FENCE_RE = re.compile(r"```[a-zA-Z0-9_\-]*\n([^`]*(?:`(?!``)[^`]*)*)```")
+
+
 def sse(data: str) -> str:
     """Format a string payload as an SSE event.
 
     Ensures each line is prefixed with "data: " and terminated with a blank line,
     matching the SSE contract consumed by the frontend.
     """
-    payload = "\n".join(f"data: {line}" for line in str(data).rstrip("\n").split("\n"))
-    return payload + "\n\n"
+    text = str(data).rstrip("\n")
+    if "\n" not in text:
+        return f"data: {text}\n\n"
+    return "data: " + text.replace("\n", "\ndata: ") + "\n\n"
+
+
+# Constant frames, encoded once at import; StreamingResponse passes bytes
+# through without re-encoding them on every send.
+_PROGRESS_START = sse(":::progress: 5").encode()
+_CHAT_READY = (
+    sse("💬 Chat ready. Use the sidebar to ask follow-ups.") + sse(":::progress: 100")
+).encode()
+# /chat frames stay str: coalesce_frames joins them before sending.
+_CHAT_START = sse(":::progress: 5")
+_CHAT_DONE = sse(":::progress: 100") + sse(":::done")
+
+
+def sse_response(
+    frames: AsyncIterator[str | bytes] | Iterator[str | bytes], thread_id: str | None = None
+) -> StreamingResponse:
+    """Wrap an iterator of SSE frames in a ``text/event-stream`` response.
+
+    ``no-cache`` and ``X-Accel-Buffering: no`` keep proxies (nginx) from
+    buffering the stream, so the first frame reaches the client immediately.
+    When a ``thread_id`` is given it is exposed to browsers via ``x-thread-id``.
+    """
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+        "Connection": "keep-alive",
+    }
+    if thread_id:
+        headers["x-thread-id"] = thread_id
+        # Allow browsers to read custom thread id header across CORS
+        headers["Access-Control-Expose-Headers"] = "x-thread-id"
+    return StreamingResponse(frames, media_type="text/event-stream", headers=headers)
+
+
+def _iter_paragraphs(text: str) -> Iterator[str]:
+    """Yield the stripped, non-empty ``"\n\n"``-separated paragraphs of ``text``.
+
+    Walks the string with ``str.find`` so only one paragraph is materialized at
+    a time, rather than the whole ``split`` list up front.
+    """
+    start = 0
+    end = len(text)
+    while start < end:
+        i = text.find("\n\n", start)
+        stop = end if i < 0 else i
+        p = text[start:stop].strip()
+        if p:
+            yield p
+        if i < 0:
+            break
+        start = i + 2
+
+
+def sse_paragraphs(text: str) -> Iterator[str]:
+    """Frame each non-empty paragraph of ``text`` as its own SSE event.
+
+    Frames are concatenated into sends of roughly ``_PARAGRAPH_BATCH_BYTES`` so a
+    typical report goes out in one ASGI send, while long reports still flush
+    progressively instead of as one monolithic chunk.
+    """
+    batch: list[str] = []
+    size = 0
+    for p in _iter_paragraphs(text):
+        frame = sse(p)
+        batch.append(frame)
+        size += len(frame)
+        if size >= _PARAGRAPH_BATCH_BYTES:
+            yield "".join(batch)
+            batch.clear()
+            size = 0
+    if batch:
+        yield "".join(batch)
+
+
+# Sent when the text already streamed is not a prefix of the final text (the
+# LLM failed mid-stream and the node fell back); the complete text follows it.
+_STREAM_REPLACED = sse("⚠️ Streaming was interrupted; the complete response follows.")
+
+
+def remaining_paragraphs(sent: str, text: str) -> Iterator[str]:
+    """Frame what a client that already received ``sent`` still needs of ``text``.
+
+    ``sent`` is the streamed text up to a paragraph break. When ``text`` extends
+    it only the rest is framed; otherwise ``_STREAM_REPLACED`` is sent, followed
+    by the whole of ``text``, so streamed and final text are never mixed.
+    """
+    if text.startswith(sent):
+        yield from sse_paragraphs(text[len(sent) :])
+    else:
+        yield _STREAM_REPLACED
+        yield from sse_paragraphs(text)
+
+
+async def coalesce_frames(
+    frames: AsyncIterator[str],
+    *,
+    window: float = _COALESCE_WINDOW_S,
+    max_frames: int = _COALESCE_MAX_FRAMES,
+) -> AsyncGenerator[str, None]:
+    """Group SSE frames that arrive close together into a single send.
+
+    A background task drains ``frames`` into a bounded queue. Frames arriving
+    within ``window`` seconds of the first pending one (up to ``max_frames``)
+    are concatenated and yielded together, preserving order. Bursty sources
+    such as per-token LLM events then cost one ASGI send per batch instead of
+    one per token. Closing this generator (e.g. on client disconnect) cancels
+    the producer.
+    """
+    queue: asyncio.Queue[object] = asyncio.Queue(maxsize=128)
+
+    async def _pump() -> None:
+        try:
+            async for frame in frames:
+                await queue.put(frame)
+        except Exception as exc:
+            await queue.put(exc)
+            return
+        await queue.put(_STREAM_END)
+
+    loop = asyncio.get_running_loop()
+    pump = asyncio.create_task(_pump())
+    try:
+        finished = False
+        while not finished:
+            item = await queue.get()
+            deadline = loop.time() + window
+            batch: list[str] = []
+            error: Exception | None = None
+            while True:
+                if item is _STREAM_END:
+                    finished = True
+                    break
+                if isinstance(item, Exception):
+                    error = item
+                    finished = True
+                    break
+                batch.append(item)  # type: ignore[arg-type]
+                remaining = deadline - loop.time()
+                if len(batch) >= max_frames or remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except TimeoutError:
+                    break
+            if batch:
+                yield "".join(batch)
+            if error is not None:
+                raise error
+    finally:
+        pump.cancel()
+        await asyncio.gather(pump, return_exceptions=True)
+
+
+async def stream_report(
+    graph_app: Any, state: dict, config: dict, final: dict
+) -> AsyncGenerator[str, None]:
+    """Run the analysis graph, yielding report paragraphs as synthesis writes them.
+
+    Synthesis tokens are buffered and each paragraph is flushed as soon as its
+    closing blank line arrives, instead of after the whole report. ``final`` is
+    filled with the graph's final state. Once the graph finishes, whatever of
+    the final report was not streamed yet is framed (all of it when nothing was
+    token-streamed); see :func:`remaining_paragraphs` for a fallback report
+    that replaces a partial LLM stream. Rising ``progress`` values from the
+    graph state are forwarded as ``:::progress:`` frames.
+    """
+    streamed: list[str] = []
+    pending = ""
+    last_progress = 5  # the opening frame already reported 5
+    async for mode, payload in graph_app.astream(
+        state, config=config, stream_mode=["messages", "values"]
+    ):
+        if mode == "messages":
+            chunk, meta = payload
+            if (meta or {}).get("langgraph_node") != "synthesis":
+                continue
+            content = getattr(chunk, "content", "")
+            if not isinstance(content, str) or not content:
+                continue
+            head, sep, pending = (pending + content).rpartition("\n\n")
+            if sep:
+                streamed.append(head + sep)
+                for frames in sse_paragraphs(head):
+                    yield frames
+        elif isinstance(payload, dict):
+            final.clear()
+            final.update(payload)
+            # Forward graph progress, but only when it moved forward by more than
+            # one point; 100 is sent with the closing frame.
+            try:
+                progress = int(payload.get("progress") or 0)
+            except (TypeError, ValueError):
+                continue
+            if last_progress + 1 < progress < 100:
+                last_progress = progress
+                yield sse(f":::progress: {progress}")
+
+    final_text = final.get("final_report")
+    if not isinstance(final_text, str) or not final_text:
+        return
+    for frames in remaining_paragraphs("".join(streamed), final_text):
+        yield frames
+
+
+def _coerce_json(obj: Any) -> Any:
+    """Recursively stringify dict keys and leaf values JSON cannot represent."""
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, list):
+        return [_coerce_json(x) for x in obj]
+    if isinstance(obj, dict):
+        return {str(k): _coerce_json(v) for k, v in obj.items()}
+    return str(obj)
 
 
 def _safe_state_for_db(state: dict | None) -> dict:
@@ -88,21 +355,23 @@ def _safe_state_for_db(state: dict | None) -> dict:
         "progress",
         "thread_id",
     }
-    out: dict = {}
-    for k in allowed:
-        if k in state:
-            out[k] = state[k]
-    # Final JSON check; coerce obviously non-serializable leaf values to string
-    def _coerce(obj):
-        if obj is None or isinstance(obj, (str, int, float, bool)):
-            return obj
-        if isinstance(obj, list):
-            return [_coerce(x) for x in obj]
-        if isinstance(obj, dict):
-            return {str(k): _coerce(v) for k, v in obj.items()}
-        return str(obj)
-
-    safe = _coerce(out)
+    out = {k: state[k] for k in allowed if k in state}
+    # One encoder pass both validates and coerces: leaves json cannot encode are
+    # stringified via default=str, and the round trip yields plain JSON types.
+    # orjson does it natively when installed; stdlib json covers what it rejects
+    # (e.g. integers beyond 64 bits).
+    try:
+        if _orjson is not None:
+            with contextlib.suppress(TypeError):
+                return _orjson.loads(
+                    _orjson.dumps(out, default=str, option=_orjson.OPT_NON_STR_KEYS)
+                )
+        return json.loads(json.dumps(out, default=str))
+    except Exception:
+        pass
+    # Slow path for what the encoders reject (e.g. tuple keys): stringify the odd
+    # keys/leaves one by one instead of losing the whole state.
+    safe = _coerce_json(out)
     try:
         json.dumps(safe)
     except Exception:
@@ -111,22 +380,101 @@ def _safe_state_for_db(state: dict | None) -> dict:
     return safe
 
 
-@router.get("/health")
-async def health() -> dict[str, str]:
-    return {"status": "healthy"}
+def _persist_report(
+    thread_id: str, title: str, report_text: str, state: dict | None, file_count: int
+) -> None:
+    """Store a finished report on its thread and invalidate cached thread views.
 
+    Synchronous (DB + Redis); stream generators run it via ``asyncio.to_thread``
+    so the write does not stall other connections on the event loop.
+    """
+    repo.upsert_thread(
+        thread_id,
+        title=title,
+        report_text=report_text,
+        state=_safe_state_for_db(state),
+        file_count=file_count,
+    )
+    # Invalidate caches on write
+    cache_delete(f"threads:item:{thread_id}")
+    cache_delete_prefix("threads:list:")
 
-@router.get("/admin/db")
-async def db_info() -> dict:
-    """Return basic DB and migration info for debugging/hydration checks."""
-    from sqlalchemy import inspect as sa_inspect
-    from sqlalchemy import text as sa_text
 
+def _ensure_thread(thread_id: str, title: str) -> None:
+    """Create the thread row if missing (idempotent, best effort; sync DB call)."""
+    with contextlib.suppress(Exception):
+        repo.create_thread(thread_id, title=title)
+
+
+async def _persist_final_report(
+    thread_id: str, title: str, state: dict, final_text: str | None, final_state: dict | None
+) -> None:
+    """Persist a finished analysis for the sidebar/history (off the event loop)."""
+    if not final_text:
+        logger.warning("No final text to persist for thread %s", thread_id)
+        return
+    try:
+        file_count = len(state.get("files", []))
+        if isinstance(final_state, dict) and isinstance(final_state.get("files"), list):
+            file_count = len(final_state.get("files", []))
+
+        await asyncio.to_thread(
+            _persist_report, thread_id, title, final_text, final_state, file_count
+        )
+        logger.info("Persisted thread %s", thread_id)
+    except Exception as e:
+        logger.warning("Thread persistence failed: %s", e)
+
+
+async def _report_event_stream(
+    graph_app: Any, state: dict, thread_id: str, config: dict, title: str, prelude: bytes
+) -> AsyncGenerator[str | bytes, None]:
+    """SSE body shared by /explain and /explain/upload.
+
+    Sends ``prelude``, streams the report via :func:`stream_report`, persists the
+    result and closes with the "Chat ready" + 100% progress frames. The thread
+    row is created concurrently with the graph run, after the first frame is out,
+    so the sidebar lists it while the report streams; the final upsert keeps its
+    title either way.
+    """
+    yield prelude
+
+    thread_created = asyncio.create_task(asyncio.to_thread(_ensure_thread, thread_id, title))
+    final_state: dict = {}
+    try:
+        async for frames in stream_report(graph_app, state, config, final_state):
+            yield frames
+    except Exception as e:
+        logger.error("Report stream failed for %s: %s", thread_id, e)
+        final_state = {}
+    final_text = final_state.get("final_report") or None
+
+    await thread_created
+    await _persist_final_report(thread_id, title, state, final_text, final_state or None)
+
+    yield _CHAT_READY
+
+
+# Constant body, encoded once; health probes never touch the DB.
+_HEALTH_RESPONSE = Response(b'{"status":"healthy"}', media_type="application/json")
+
+# /admin/db probes (connect + alembic query + table inspection) are memoized
+# for this long, so pollers cost at most one round of DB calls per window.
+_DB_INFO_TTL_S = 30.0
+_db_info_cache: tuple[float, dict] | None = None
+
+
+@router.get("/health", response_model=dict[str, str])
+async def health() -> Response:
+    return _HEALTH_RESPONSE
+
+
+@lru_cache(maxsize=1)
+def _redacted_database_url() -> str:
+    """Configured DATABASE_URL with the password masked (settings are static)."""
     from backend.app.core.config import get_settings
-    from backend.app.db.db import engine
 
-    settings = get_settings()
-    url = str(settings.DATABASE_URL)
+    url = str(get_settings().DATABASE_URL)
     # Redact password in URL
     if "@" in url and ":" in url.split("@", 1)[0]:
         try:
@@ -137,6 +485,17 @@ async def db_info() -> dict:
             url = f"{scheme}://{user}:***@{right}"
         except Exception:
             pass
+    return url
+
+
+def _collect_db_info() -> dict:
+    """Query DB URL, alembic head and tables (sync; run via ``asyncio.to_thread``)."""
+    from sqlalchemy import inspect as sa_inspect
+    from sqlalchemy import text as sa_text
+
+    from backend.app.db.db import engine
+
+    url = _redacted_database_url()
 
     alembic_head = None
     try:
@@ -161,48 +520,88 @@ async def db_info() -> dict:
     }
 
 
-def _extract_code_from_messages(messages: list[Message] | None) -> str:
-    """Extract a code block (``` ... ```) from messages; fallback to last user text."""
-    fence = re.compile(r"```[a-zA-Z0-9_\-]*\n([\s\S]*?)```", re.MULTILINE)
-    for msg in reversed(messages or []):
-        for m in fence.finditer(msg.content or ""):
-            block = m.group(1).strip()
-            if block:
-                return block
-    return (messages[-1].content if messages else "").strip()
+@router.get("/admin/db")
+async def db_info() -> dict:
+    """Return basic DB and migration info for debugging/hydration checks."""
+    global _db_info_cache
+    now = time.monotonic()
+    cached = _db_info_cache
+    if cached is not None and now - cached[0] < _DB_INFO_TTL_S:
+        return cached[1]
+    info = await asyncio.to_thread(_collect_db_info)
+    _db_info_cache = (now, info)
+    return info
+
+
+def _first_fenced_block(text: str) -> str:
+    """Return the first non-empty fenced code block in ``text`` (or "")."""
+    # Most chat turns carry no fence; skip the regex for them.
+    if "```" not in text:
+        return ""
+    for m in _FENCE_RE.finditer(text):
+        block = m.group(1).strip()
+        if block:
+            return block
+    return ""
+
+
+def _code_and_history(req: ExplainRequest) -> tuple[str, list[dict[str, str]]]:
+    """Derive the code to analyze and the recent history in one pass.
+
+    Walks the last ``_HISTORY_LIMIT`` messages newest-first, building the
+    history while looking for the most recent fenced code block. An explicit
+    ``req.code`` wins and skips the fence scan; with no block found, the last
+    message's text is used as code.
+    """
+    code = req.code
+    messages = req.messages
+    if not messages:
+        return code or "", []
+    window = messages[-_HISTORY_LIMIT:]
+    if code:
+        # Common case (pasted code): no fence scan, no reversal
+        return code, [{"role": m.role, "content": m.content} for m in window]
+
+    code = ""
+    history: list[dict[str, str]] = []
+    for m in reversed(window):
+        history.append({"role": m.role, "content": m.content})
+        if not code:
+            code = _first_fenced_block(m.content or "")
+    history.reverse()
+    return code or (window[-1].content or "").strip(), history
 
 
-def _extract_code(req: ExplainRequest) -> str:
-    code = req.code or _extract_code_from_messages(req.messages)
-    return code or ""
+def _history_from_messages(messages: list[Message] | None) -> list[dict[str, str]]:
+    return [{"role": m.role, "content": m.content} for m in (messages or [])[-_HISTORY_LIMIT:]]
 
 
-def _history_from_messages(messages: list[Message] | None) -> list[dict[str, str]]:
-    return [{"role": m.role, "content": m.content} for m in (messages or [])][-20:]
+def _wants_json(request: Request) -> bool:
+    """True when the client asked for a buffered JSON reply instead of SSE."""
+    if request.query_params.get("stream") == "0":
+        return True
+    accept = request.headers.get("accept", "")
+    return accept.startswith("application/json") and "text/event-stream" not in accept
 
 
 @router.post("/explain")
 async def explain(
     request: Request,
     body: ExplainRequest,
-) -> StreamingResponse:
+) -> Response:
     """Stream code review using the compiled graph with minimal routing logic."""
     graph_app = request.app.state.graph_app  # set in main.py
 
-    code = _extract_code(body)
-    if not code and (body.mode or "") != "chat" and not body.files:
-        return StreamingResponse(
-            iter(["Please provide code or files to analyze.\n"]),
-            media_type="text/plain",
-        )
+    code, history = _code_and_history(body)
+    if not code and not body.files:
+        if (body.mode or "") != "chat":
+            return sse_response(iter([sse("Please provide code or files to analyze.")]))
+        if not body.messages:
+            # Empty chat poll: nothing to answer, skip thread setup and the graph.
+            return sse_response(iter([sse("Please ask a question.")]))
 
     thread_id = body.thread_id or request.headers.get("x-thread-id") or str(uuid.uuid4())
-    # Ensure thread exists so messages persist even if chat is called first
-    with contextlib.suppress(Exception):
-        repo.create_thread(thread_id, title=f"Analysis {thread_id[:8]}")
-    # Create thread immediately (idempotent)
-    with contextlib.suppress(Exception):
-        repo.create_thread(thread_id, title=f"Analysis {thread_id[:8]}")
+    title = f"Analysis {thread_id[:8]}"
 
     logger.info(
         "Explain request: thread_id=%s mode=%s",
@@ -210,11 +609,12 @@ async def explain(
         body.mode or "orchestrator",
     )
 
-    history = _history_from_messages(body.messages)
     mode = body.mode or "orchestrator"
     agents = body.agents or ["quality", "bug", "security"]
 
-    # Initial state setup
+    # Initial state setup (graph modules load lazily, on first use)
+    from backend.graph.state import initial_state
+
     state = initial_state(code=code, history=history, mode=mode, agents=agents)
     state["thread_id"] = thread_id
     # Per-request model override from body or header
@@ -226,73 +626,58 @@ async def explain(
         pass
 
     # Determine source and inputs
-    source = getattr(body, "source", None)
-    if not source:
-        source = "files" if body.files else "pasted"
-
-    state["source"] = str(source)
+    state["source"] = body.source or ("files" if body.files else "pasted")
 
     if body.files:
         state["files"] = [{"path": f.path, "content": f.content} for f in body.files]
 
     # Server-side folder scanning via entry/folder_path is not supported
 
-    async def event_stream() -> AsyncGenerator[str, None]:
-        yield sse(":::progress: 5")
-
-        final_text: str | None = None
-        final_state: dict | None = None
+    config = {"configurable": {"thread_id": thread_id}}
 
+    async def run_report() -> tuple[str | None, dict | None]:
         try:
-            final = await graph_app.ainvoke(
-                state, config={"configurable": {"thread_id": thread_id}}
-            )
-            final_text = (final or {}).get("final_report") or None
-            if isinstance(final, dict):
-                final_state = final
+            final = await graph_app.ainvoke(state, config=config)
         except Exception as inv_err:
             logger.error("Explain ainvoke failed: %s", inv_err)
+            return None, None
+        final_text = (final or {}).get("final_report") or None
+        return final_text, final if isinstance(final, dict) else None
+
+    # Non-streaming clients (CLI, batch jobs) get the final report as one JSON body.
+    if _wants_json(request):
+        # Nothing shows the thread mid-request here; the final upsert creates it.
+        final_text, final_state = await run_report()
+        await _persist_final_report(thread_id, title, state, final_text, final_state)
+        return JSONResponse(
+            {"final_report": final_text or "", "thread_id": thread_id},
+            headers={"x-thread-id": thread_id},
+        )
 
-        if final_text:
-            for para in final_text.split("\n\n"):
-                p = para.strip()
-                if p:
-                    yield sse(p)
+    return sse_response(
+        _report_event_stream(graph_app, state, thread_id, config, title, _PROGRESS_START),
+        thread_id,
+    )
 
-        # Persist thread for sidebar/history
-        if final_text:
-            try:
-                file_count = len(state.get("files", []))
-                if isinstance(final_state, dict) and isinstance(final_state.get("files"), list):
-                    file_count = len(final_state.get("files", []))
-
-                repo.update_thread(
-                    thread_id,
-                    report_text=final_text,
-                    state=_safe_state_for_db(final_state),
-                    file_count=file_count,
-                )
-                # Invalidate caches on write
-                cache_delete(f"threads:item:{thread_id}")
-                cache_delete_prefix("threads:list:")
-                logger.info("Persisted thread %s", thread_id)
-            except Exception as e:
-                logger.warning("Thread persistence failed: %s", e)
-        else:
-            logger.warning(f"No final text to persist for thread {thread_id}")
-
-        yield sse("💬 Chat ready. Use the sidebar to ask follow-ups.")
-        yield sse(":::progress: 100")
 
-    headers = {
-        "Cache-Control": "no-cache",
-        "X-Accel-Buffering": "no",
-        "Connection": "keep-alive",
-        "x-thread-id": thread_id,
-        # Allow browsers to read custom thread id header across CORS
-        "Access-Control-Expose-Headers": "x-thread-id",
-    }
-    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
+async def _read_upload_text(upload: Any, max_bytes: int) -> str | None:
+    """Decode an upload as UTF-8 chunk by chunk; ``None`` if it exceeds ``max_bytes``.
+
+    Undecodable bytes become U+FFFD instead of dropping the whole file.
+    """
+    size = getattr(upload, "size", None)
+    if isinstance(size, int) and size > max_bytes:
+        return None
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts: list[str] = []
+    total = 0
+    while chunk := await upload.read(_UPLOAD_CHUNK_BYTES):
+        total += len(chunk)
+        if total > max_bytes:
+            return None
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
 
 
 @router.post("/explain/upload")
@@ -300,6 +685,7 @@ async def explain_upload(
     request: Request,
 ) -> StreamingResponse:
     """Accept multipart file upload for analysis."""
+    graph_app = request.app.state.graph_app  # set in main.py
 
     # Get form data
     form = await request.form()
@@ -309,28 +695,29 @@ async def explain_upload(
     agents = [a.strip() for a in str(agents_str).split(",") if a.strip()]
 
     if not uploaded_files:
-        return StreamingResponse(iter(["No files uploaded.\n"]), media_type="text/plain")
+        return sse_response(iter([sse("No files uploaded.")]))
+
+    # Read uploaded files (size-capped, decoded incrementally)
+    from backend.app.core.config import get_settings
 
-    # Read uploaded files
+    max_bytes = get_settings().MAX_UPLOAD_BYTES
     file_inputs = []
     for upload in uploaded_files:
         if hasattr(upload, "read"):
-            content = await upload.read()
-            try:
-                text = content.decode("utf-8")
-                file_inputs.append({"path": upload.filename or "uploaded_file", "content": text})
-            except UnicodeDecodeError:
+            text = await _read_upload_text(upload, max_bytes)
+            if text is None:
+                logger.warning(
+                    "Skipping upload %s: larger than %d bytes", upload.filename, max_bytes
+                )
                 continue
+            file_inputs.append({"path": upload.filename or "uploaded_file", "content": text})
 
     if not file_inputs:
-        return StreamingResponse(iter(["No valid text files found.\n"]), media_type="text/plain")
+        return sse_response(iter([sse("No valid text files found.")]))
 
-    graph_app = request.app.state.graph_app
     thread_id = str(uuid.uuid4())
 
-    # Create thread
-    with contextlib.suppress(Exception):
-        repo.create_thread(thread_id, title=f"Upload Analysis {thread_id[:8]}")
+    from backend.graph.state import initial_state
 
     state = initial_state(code="", history=[], mode=str(mode), agents=agents)
     state["thread_id"] = thread_id
@@ -345,52 +732,12 @@ async def explain_upload(
     )
 
     # Reuse the same streaming logic
-
-    async def event_stream() -> AsyncGenerator[str, None]:
-        yield sse(":::progress: 5")
-        yield sse(f"📁 Uploaded {len(file_inputs)} files")
-
-        final_text: str | None = None
-        final_state: dict | None = None
-
-        try:
-            final = await graph_app.ainvoke(
-                state, config={"configurable": {"thread_id": thread_id}}
-            )
-            final_text = (final or {}).get("final_report") or None
-            if isinstance(final, dict):
-                final_state = final
-        except Exception as e:
-            logger.error("Upload ainvoke failed: %s", e)
-
-        if final_text:
-            for para in final_text.split("\n\n"):
-                p = para.strip()
-                if p:
-                    yield sse(p)
-
-        if final_text:
-            with contextlib.suppress(Exception):
-                repo.update_thread(
-                    thread_id,
-                    report_text=final_text,
-                    state=_safe_state_for_db(final_state),
-                    file_count=len(file_inputs),
-                )
-                cache_delete(f"threads:item:{thread_id}")
-                cache_delete_prefix("threads:list:")
-
-        yield sse("💬 Chat ready. Use the sidebar to ask follow-ups.")
-        yield sse(":::progress: 100")
-
-    headers = {
-        "Cache-Control": "no-cache",
-        "X-Accel-Buffering": "no",
-        "Connection": "keep-alive",
-        "x-thread-id": thread_id,
-        "Access-Control-Expose-Headers": "x-thread-id",
-    }
-    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
+    config = {"configurable": {"thread_id": thread_id}}
+    prelude = _PROGRESS_START + sse(f"📁 Uploaded {len(file_inputs)} files").encode()
+    title = f"Upload Analysis {thread_id[:8]}"
+    return sse_response(
+        _report_event_stream(graph_app, state, thread_id, config, title, prelude), thread_id
+    )
 
 
 @router.post("/analyze")
@@ -414,13 +761,19 @@ async def chat(request: Request, body: ExplainRequest) -> StreamingResponse:
         question = body.messages[-1].content or ""
         # Persist user message
         with contextlib.suppress(Exception):
-            repo.add_message(thread_id, "user", question)
+            await asyncio.to_thread(repo.add_message, thread_id, "user", question)
+
+    if not question.strip():
+        # Same reply chat_reply gives, without the DB reads and graph run.
+        return sse_response(
+            iter([_CHAT_START, sse("Please include a question."), _CHAT_DONE]), thread_id
+        )
 
     # Prepare chat state; merge any persisted analysis state so chat is grounded
     # even when the LangGraph checkpointer is disabled or not yet warmed.
     persisted_state: dict | None = None
     try:
-        th = repo.get_thread(thread_id)
+        th = await asyncio.to_thread(repo.get_thread, thread_id)
         if th and isinstance(th.state_json, dict):
             persisted_state = th.state_json
     except Exception:
@@ -434,24 +787,25 @@ async def chat(request: Request, body: ExplainRequest) -> StreamingResponse:
 
     # Include recent conversation history for better free-form chat
     try:
-        _msgs = repo.get_messages(thread_id)
+        _msgs = await asyncio.to_thread(repo.get_messages, thread_id)
         persisted_history = [
-            {"role": m.role, "content": m.content} for m in _msgs[-20:]
+            {"role": m.role, "content": m.content} for m in _msgs[-_HISTORY_LIMIT:]
         ]
     except Exception:
         persisted_history = []
 
-    merged_history: list[dict] = []
-    if persisted_history:
-        merged_history.extend(persisted_history)
+    merged_history: list[dict] = list(persisted_history or [])
     if incoming_history:
-        tail = set((m.get("role"), m.get("content")) for m in merged_history[-20:])
+        # Client-sent messages already in the persisted window, or repeated within
+        # the request, are dropped; persisted history itself is kept as-is.
+        seen = dict.fromkeys((m.get("role"), m.get("content")) for m in merged_history)
         for m in incoming_history:
             key = (m.get("role"), m.get("content"))
-            if key not in tail:
+            if key not in seen:
+                seen[key] = None
                 merged_history.append(m)
     if merged_history:
-        chat_state["history"] = merged_history[-20:]
+        chat_state["history"] = merged_history[-_HISTORY_LIMIT:]
 
     # Model override
     try:
@@ -461,104 +815,77 @@ async def chat(request: Request, body: ExplainRequest) -> StreamingResponse:
     except Exception:
         pass
 
+    config = {"configurable": {"thread_id": thread_id}}
+
     async def stream_chat() -> AsyncGenerator[str, None]:
         chunks: list[str] = []
-        final_reply_text: str | None = None
-        persisted = False
+        # Tokens are framed a whole paragraph at a time: the frontend renders each
+        # event as its own line, so per-token frames would break the reply apart.
+        streamed: list[str] = []
+        pending = ""
+        # Error replies are shown to the user but not stored in the thread.
+        persist_reply = True
 
         def _append_chunk(text: str) -> None:
-            nonlocal final_reply_text
-            if not text:
-                return
-            chunks.append(text)
-            final_reply_text = "".join(chunks)
+            if text:
+                chunks.append(text)
 
         def _persist_assistant_reply() -> None:
-            nonlocal persisted, final_reply_text
-            if persisted:
-                return
             try:
-                reply_text = (final_reply_text or "".join(chunks)).strip()
+                reply_text = "".join(chunks).strip()
                 if reply_text:
                     repo.add_message(thread_id, "assistant", reply_text)
                     # Touch thread.updated_at without changing other fields
                     repo.update_thread(thread_id, title=None)
-                persisted = True
             except Exception as persist_err:
                 logger.warning("Chat persistence failed for %s: %s", thread_id, persist_err)
 
         # Emit initial progress to nudge clients to render
-        yield sse(":::progress: 5")
+        yield _CHAT_START
+
+        final_values: dict | None = None
         try:
-            async for event in graph_app.astream_events(
-                chat_state,
-                version="v2",
-                config={"configurable": {"thread_id": thread_id}},
+            # "messages" carries LLM tokens tagged with the emitting node; "values"
+            # carries the state after each step, so the last one is the final state.
+            async for mode, payload in graph_app.astream(
+                chat_state, config=config, stream_mode=["messages", "values"]
             ):
-                etype = event.get("event")
-                name = event.get("name")
-                data = event.get("data", {})
-
-                if etype == "on_chat_model_stream" and name == "chat_reply":
-                    chunk = data.get("chunk")
-                    content = ""
-                    if hasattr(chunk, "content"):
-                        content = chunk.content
-                    elif isinstance(chunk, dict):
-                        content = chunk.get("content", "")
-                    if content:
-                        _append_chunk(content)
-                        # Stream as SSE for consistency with frontend parsing
-                        yield sse(content)
-
-                if etype == "on_node_end" and name == "chat_reply":
-                    out = data.get("output") or data.get("result") or data.get("state") or {}
-                    if isinstance(out, dict):
-                        text = out.get("chat_response")
-                        if text and not chunks:
-                            # If no token stream, emit full text in paragraphs
-                            for para in str(text).split("\n\n"):
-                                p = para.strip()
-                                if p:
-                                    yield sse(p)
-                            _append_chunk(str(text))
-                        # Persist promptly on node completion
-                        _persist_assistant_reply()
-
-                # Some langgraph versions only surface final output on graph end
-                if etype == "on_graph_end" and not chunks:
-                    out = data.get("output") or data.get("result") or {}
-                    if isinstance(out, dict):
-                        text = out.get("chat_response")
-                        if text:
-                            for para in str(text).split("\n\n"):
-                                p = para.strip()
-                                if p:
-                                    yield sse(p)
-                            _append_chunk(str(text))
-                        _persist_assistant_reply()
+                if mode == "messages":
+                    chunk, meta = payload
+                    if (meta or {}).get("langgraph_node") != "chat_reply":
+                        continue
+                    content = getattr(chunk, "content", "")
+                    if isinstance(content, str) and content:
+                        head, sep, pending = (pending + content).rpartition("\n\n")
+                        if sep:
+                            streamed.append(head + sep)
+                            for frames in sse_paragraphs(head):
+                                yield frames
+                elif isinstance(payload, dict):
+                    final_values = payload
+                    # Between graph steps: stop running nodes for a client that left.
+                    if await request.is_disconnected():
+                        logger.info("Chat client disconnected: thread_id=%s", thread_id)
+                        return
         except Exception as e:
             logger.error("Chat streaming failed: %s", e)
             fallback = "Sorry, I encountered an error generating a response."
             yield sse(fallback)
             _append_chunk(fallback)
-
-        # If nothing was emitted via events, fall back to a final invoke
-        if not chunks:
-            try:
-                final = await graph_app.ainvoke(
-                    chat_state, config={"configurable": {"thread_id": thread_id}}
-                )
-                text = (final or {}).get("chat_response")
-                if text:
-                    for para in str(text).split("\n\n"):
-                        p = para.strip()
-                        if p:
-                            yield sse(p)
-                    _append_chunk(str(text))
-                _persist_assistant_reply()
-            except Exception as inv_err:
-                logger.error("Chat fallback ainvoke failed: %s", inv_err)
+            persist_reply = False
+
+        # Emit the final reply, minus the paragraphs already streamed (all of it
+        # when there was no token stream, e.g. no LLM configured)
+        sent = "".join(streamed)
+        text = final_values.get("chat_response") if final_values else None
+        if not chunks and text:
+            for frames in remaining_paragraphs(sent, str(text)):
+                yield frames
+            _append_chunk(str(text))
+        elif not chunks and (sent + pending).strip():
+            for frames in sse_paragraphs(pending):
+                yield frames
+            _append_chunk(sent + pending)
 
         # Absolute fallback so the UI always receives a response
         if not chunks:
@@ -568,31 +895,26 @@ async def chat(request: Request, body: ExplainRequest) -> StreamingResponse:
             )
             yield sse(fallback_text)
             _append_chunk(fallback_text)
-            _persist_assistant_reply()
+
+        # Persist the assistant reply once, after every path has run
+        if persist_reply:
+            await asyncio.to_thread(_persist_assistant_reply)
 
         # Final done marker and 100% progress to signal completion
-        yield sse(":::progress: 100")
-        yield sse(":::done")
+        yield _CHAT_DONE
 
-    headers = {
-        "Cache-Control": "no-cache",
-        "X-Accel-Buffering": "no",
-        "Connection": "keep-alive",
-        "x-thread-id": thread_id,
-        "Access-Control-Expose-Headers": "x-thread-id",
-    }
-    return StreamingResponse(stream_chat(), media_type="text/event-stream", headers=headers)
+    return sse_response(coalesce_frames(stream_chat()), thread_id)
 
 
-@router.get("/threads")
-async def list_threads(limit: int = 50) -> list[dict]:
+@router.get("/threads", response_model=list[dict])
+async def list_threads(limit: int = 50) -> Response:
     """Return recent threads for the sidebar."""
     try:
         # Try cache first
         cache_key = f"threads:list:{int(limit)}"
         cached = cache_get_json(cache_key)
         if isinstance(cached, list):
-            return cached
+            return _FastJSONResponse(cached)
 
         threads = repo.list_threads(limit=limit)
         out = [
@@ -607,23 +929,23 @@ async def list_threads(limit: int = 50) -> list[dict]:
             for t in threads
         ]
         cache_set_json(cache_key, out, ttl_seconds=30)
-        return out
+        return _FastJSONResponse(out)
     except Exception:
-        return []
+        return _FastJSONResponse([])
 
 
-@router.get("/threads/{thread_id}")
-async def get_thread(thread_id: str) -> dict:
+@router.get("/threads/{thread_id}", response_model=dict)
+async def get_thread(thread_id: str) -> Response:
     """Return a single thread with state and messages."""
     # Cache first
     cache_key = f"threads:item:{thread_id}"
     cached = cache_get_json(cache_key)
     if isinstance(cached, dict) and cached.get("thread_id"):
-        return cached
+        return _FastJSONResponse(cached)
 
     th = repo.get_thread(thread_id)
     if not th:
-        return {}
+        return _FastJSONResponse({})
 
     msgs = repo.get_messages(thread_id)
     out = {
@@ -638,7 +960,7 @@ async def get_thread(thread_id: str) -> dict:
         ],
     }
     cache_set_json(cache_key, out, ttl_seconds=30)
-    return out
+    return _FastJSONResponse(out)
 
 
 # CRUD for threads
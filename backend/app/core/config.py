@@ -36,6 +36,8 @@ class Settings:
         Minimal total bytes threshold to trigger vector indexing.
     LOG_LEVEL: str
         Application log level.
+    MAX_UPLOAD_BYTES: int
+        Per-file size cap for /explain/upload; larger files are skipped.
     # Note: Celery support has been removed.
     """
 
@@ -51,6 +53,7 @@ class Settings:
     QDRANT_MIN_BYTES: int = int(os.getenv("QDRANT_MIN_BYTES", "100000"))
 
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", str(2 * 1024 * 1024)))
 
     # LLM caching configuration
     # Backend: none | memory | redis | redis_semantic
@@ -6,8 +6,11 @@ Provides a simple, colored formatter for INFO/DEBUG/ERROR and helpers to
 create module loggers consistently across the codebase.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from dataclasses import dataclass
 from typing import Final
@@ -61,6 +64,16 @@ def _color_enabled() -> bool:
         return False
 
 
+_listener: logging.handlers.QueueListener | None = None
+
+
+@atexit.register
+def _stop_listener() -> None:
+    # Flush queued records on interpreter exit
+    if _listener is not None:
+        _listener.stop()
+
+
 def setup_logging(level: str | None = "INFO") -> None:
     """Configure root logging with a concise, colored format.
 
@@ -70,10 +83,15 @@ def setup_logging(level: str | None = "INFO") -> None:
         Log level name, e.g., "INFO", "DEBUG".
     """
 
+    global _listener
+
     # Reset existing handlers to avoid duplicate logs under reloaders
     root = logging.getLogger()
     for h in list(root.handlers):
         root.removeHandler(h)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
     root.setLevel(getattr(logging, (level or "INFO").upper(), logging.INFO))
     handler = logging.StreamHandler(stream=sys.stdout)
@@ -84,7 +102,12 @@ def setup_logging(level: str | None = "INFO") -> None:
         handler.setFormatter(
             logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
         )
-    root.addHandler(handler)
+    # Request handlers only enqueue records; a background thread does the
+    # (possibly blocking) stdout writes.
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
 
 
 def get_logger(name: str) -> logging.Logger:
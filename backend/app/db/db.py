@@ -5,13 +5,16 @@ from sqlalchemy.orm import sessionmaker
 
 from backend.app.core.config import get_settings
 from backend.app.db.models import Base
+from backend.app.db.sqlite import apply_sqlite_pragmas
 
 settings = get_settings()
 
+
 # Postgres-only persistence. If DATABASE_URL is unset, disable persistence.
 db_url = (settings.DATABASE_URL or "").strip()
 if db_url:
     engine = create_engine(db_url, pool_pre_ping=True)
+    apply_sqlite_pragmas(engine)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 else:  # persistence disabled for tests/local without DB
     engine = None  # type: ignore[assignment]
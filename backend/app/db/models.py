@@ -1,9 +1,13 @@
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import JSON, DateTime, Integer, String, Text
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+# JSONB on Postgres (binary, indexable); plain JSON elsewhere (e.g. SQLite in dev)
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Base(DeclarativeBase):
     pass
@@ -11,6 +15,7 @@ class Base(DeclarativeBase):
 
 class Thread(Base):
     __tablename__ = "threads"
+    __table_args__ = (Index("ix_threads_updated_at", "updated_at"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     title: Mapped[str | None] = mapped_column(String, nullable=True)
@@ -19,15 +24,16 @@ class Thread(Base):
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
     report_text: Mapped[str | None] = mapped_column(Text, nullable=True)
-    state_json: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    state_json: Mapped[dict[str, Any] | None] = mapped_column(JSONVariant, nullable=True)
     file_count: Mapped[int] = mapped_column(Integer, default=0)
 
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (Index("ix_messages_thread_created", "thread_id", "created_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    thread_id: Mapped[str] = mapped_column(String, index=True)
+    thread_id: Mapped[str] = mapped_column(String)
     role: Mapped[str] = mapped_column(String)  # 'user' or 'assistant'
     content: Mapped[str] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
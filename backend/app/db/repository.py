@@ -109,6 +109,70 @@ class ThreadRepository:
             if self.db is None and db is not None:
                 db.close()
 
+    def upsert_thread(
+        self,
+        thread_id: str,
+        title: str = "New Analysis",
+        report_text: str | None = None,
+        state: dict[str, Any] | None = None,
+        file_count: int = 0,
+    ) -> None:
+        """Create or update a thread in a single ``INSERT ... ON CONFLICT DO UPDATE``.
+
+        ``title`` only applies when the row is new; an existing title is kept.
+        Dialects without native upsert fall back to :meth:`create_thread` followed
+        by :meth:`update_thread`.
+        """
+        db = self._get_session()
+        if db is None:
+            th = _MEM_THREADS.get(thread_id) or Thread(id=thread_id, title=title)
+            if report_text is not None:
+                th.report_text = report_text
+            if state is not None:
+                th.state_json = state
+            if file_count > 0:
+                th.file_count = file_count
+            th.updated_at = datetime.utcnow()
+            _MEM_THREADS[thread_id] = th
+            return
+        try:
+            dialect = db.get_bind().dialect.name
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            elif dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                insert = None
+            if insert is None:
+                self.create_thread(thread_id, title=title)
+                self.update_thread(thread_id, report_text, state, file_count)
+                return
+
+            now = datetime.utcnow()
+            values: dict[str, Any] = {
+                "id": thread_id,
+                "title": title,
+                "created_at": now,
+                "updated_at": now,
+                "file_count": file_count,
+            }
+            changes: dict[str, Any] = {"updated_at": now}
+            if report_text is not None:
+                values["report_text"] = changes["report_text"] = report_text
+            if state is not None:
+                values["state_json"] = changes["state_json"] = state
+            if file_count > 0:
+                changes["file_count"] = file_count
+            stmt = insert(Thread).values(**values)
+            db.execute(stmt.on_conflict_do_update(index_elements=[Thread.id], set_=changes))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            if self.db is None and db is not None:
+                db.close()
+
     def list_threads(self, limit: int = 50) -> list[Thread]:
         db = self._get_session()
         if db is None:
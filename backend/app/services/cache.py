@@ -12,6 +12,11 @@ try:  # optional dependency; cache degrades to no-op if missing
 except Exception:  # pragma: no cover
     redis = None  # type: ignore
 
+try:  # optional dependency; falls back to stdlib json
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 from backend.app.core.config import get_settings
 from backend.app.core.logging import get_logger
 
@@ -21,6 +26,19 @@ logger = get_logger(__name__)
 _client = None
 
 
+def _dumps(value: Any) -> str | bytes:
+    if orjson is not None:
+        # Match json.dumps for non-str keys (e.g. ints) instead of raising
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value)
+
+
+def _loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def get_redis_client():
     global _client
     if _client is not None:
@@ -49,7 +67,7 @@ def cache_get_json(key: str) -> Any | None:
         data = client.get(key)
         if not data:
             return None
-        return json.loads(data)
+        return _loads(data)
     except Exception:
         return None
 
@@ -59,7 +77,7 @@ def cache_set_json(key: str, value: Any, ttl_seconds: int = 30) -> None:
     if client is None:
         return
     try:
-        payload = json.dumps(value)
+        payload = _dumps(value)
         client.set(key, payload, ex=ttl_seconds)
     except Exception:
         # Best effort
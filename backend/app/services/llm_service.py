@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+"""LLM client helper.
+
+Provides shared ChatOpenAI clients, one per (model, temperature, timeout), so graph
+nodes reuse the underlying HTTP connection pool instead of building a client per call.
+"""
+
+from functools import lru_cache
+
+try:
+    from langchain_openai import ChatOpenAI  # type: ignore
+except ImportError:  # pragma: no cover
+    ChatOpenAI = None
+
+
+@lru_cache(maxsize=16)
+def get_chat_model(model: str, temperature: float, timeout: float | None = None) -> ChatOpenAI:
+    if ChatOpenAI is None:
+        raise RuntimeError("langchain-openai is not installed; cannot create a chat model")
+    return ChatOpenAI(model=model, temperature=temperature, timeout=timeout)
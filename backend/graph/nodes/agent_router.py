@@ -3,9 +3,9 @@
 from typing import Any
 
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
 
 from backend.app.core.config import get_settings
+from backend.app.services.llm_service import get_chat_model
 
 ROUTER_SYSTEM_PROMPT = """You are an intent classifier for code review questions.
 Classify the user's question into one of these categories:
@@ -44,9 +44,9 @@ def classify_question(question: str) -> str:
         return "bug"
 
     # Try LLM classification if available
-    if settings.OPENAI_API_KEY and ChatOpenAI is not None:
+    if settings.OPENAI_API_KEY:
         try:
-            llm = ChatOpenAI(model=settings.OPENAI_MODEL, temperature=0.0)
+            llm = get_chat_model(settings.OPENAI_MODEL, 0.0)
             messages = [SystemMessage(content=ROUTER_SYSTEM_PROMPT), HumanMessage(content=question)]
             result = llm.invoke(messages)
             category = str(getattr(result, "content", "")).strip().lower()
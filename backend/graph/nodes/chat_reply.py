@@ -11,6 +11,19 @@ import json
 from typing import Any
 
 from backend.app.core.config import get_settings
+from backend.app.services.llm_service import get_chat_model
+
+# Static prompt text, built once at import rather than on every chat turn.
+_PROMPT_PREAMBLE = (
+    "You are a concise code review assistant.",
+    "Answer the user's question using the stored analysis and any retrieved code context.",
+    "Do not paste or restate the full code review report. Be specific and brief.",
+    "If the question is vague (e.g., 'more'), ask 2-3 precise follow-up questions instead of repeating content.",
+)
+_PROMPT_GUIDELINES = (
+    "\nGuidelines: Answer the question directly, reference files/lines if helpful,"
+    " never dump the whole report, and avoid repeating earlier replies."
+)
 
 
 def _fallback_reply(state: dict[str, Any]) -> str:
@@ -53,29 +66,19 @@ def _fallback_reply(state: dict[str, Any]) -> str:
     return "".join(parts)
 
 
-def chat_reply_node(state: dict[str, Any]) -> dict[str, Any]:
-    """Generate a chat reply based on the existing review and query.
-
-    Parameters
-    ----------
-    state : dict[str, Any]
-        Graph state containing chat_query and existing reports
-
-    Returns
-    -------
-    dict[str, Any]
-        Updated state with final_report containing the chat response
-    """
-    settings = get_settings()
-    query = (state.get("chat_query") or "").strip()
-    if not query:
-        return {"chat_response": "Please include a question."}
+def _reports_section(state: dict[str, Any]) -> str:
+    return "\n".join(
+        [
+            "## Stored Reports (JSON)",
+            "Security:\n" + json.dumps(state.get("security_report") or {}, indent=2),
+            "Quality:\n" + json.dumps(state.get("quality_report") or {}, indent=2),
+            "Bugs:\n" + json.dumps(state.get("bug_report") or {}, indent=2),
+        ]
+    )
 
-    # Get existing reports
-    security_report = state.get("security_report") or {}
-    quality_report = state.get("quality_report") or {}
-    bug_report = state.get("bug_report") or {}
 
+def _build_prompt(state: dict[str, Any], query: str) -> str:
+    """Assemble the LLM prompt from stored reports, retrieved context and history."""
     # Get retrieved context docs from RAG (if available)
     chat_context_docs = state.get("chat_context_docs") or []
     history = state.get("history") or []
@@ -92,40 +95,44 @@ def chat_reply_node(state: dict[str, Any]) -> dict[str, Any]:
         context_section = "\n".join(context_parts)
 
     # Build prompt (no full report paste; free-form answer grounded in reports)
-    prompt_parts = [
-        "You are a concise code review assistant.",
-        "Answer the user's question using the stored analysis and any retrieved code context.",
-        "Do not paste or restate the full code review report. Be specific and brief.",
-        "If the question is vague (e.g., 'more'), ask 2-3 precise follow-up questions instead of repeating content.",
-        f"User Question: {query}",
-        "",
-    ]
+    prompt_parts = [*_PROMPT_PREAMBLE, f"User Question: {query}", ""]
 
     if context_section:
         prompt_parts.append(context_section)
         prompt_parts.append("")
 
-    prompt_parts.append("## Stored Reports (JSON)")
-    prompt_parts.append("Security:\n" + json.dumps(security_report, indent=2))
-    prompt_parts.append("Quality:\n" + json.dumps(quality_report, indent=2))
-    prompt_parts.append("Bugs:\n" + json.dumps(bug_report, indent=2))
+    prompt_parts.append(_reports_section(state))
     if history:
         prompt_parts.append("\nRecent Conversation (JSON):\n" + json.dumps(history[-10:], indent=2))
-    prompt_parts.append(
-        "\nGuidelines: Answer the question directly, reference files/lines if helpful,"
-        " never dump the whole report, and avoid repeating earlier replies."
-    )
+    prompt_parts.append(_PROMPT_GUIDELINES)
+
+    return "\n".join(prompt_parts)
+
 
-    prompt = "\n".join(prompt_parts)
+def chat_reply_node(state: dict[str, Any]) -> dict[str, Any]:
+    """Generate a chat reply based on the existing review and query.
+
+    Parameters
+    ----------
+    state : dict[str, Any]
+        Graph state containing chat_query and existing reports
+
+    Returns
+    -------
+    dict[str, Any]
+        Updated state with final_report containing the chat response
+    """
+    settings = get_settings()
+    query = (state.get("chat_query") or "").strip()
+    if not query:
+        return {"chat_response": "Please include a question."}
 
     reply: str | None = None
     if settings.OPENAI_API_KEY:
         try:
-            from langchain_openai import ChatOpenAI  # type: ignore
-
             model_name = (state.get("llm_model") or settings.OPENAI_MODEL)
-            llm = ChatOpenAI(model=str(model_name), temperature=0.3)
-            result = llm.invoke(prompt)
+            llm = get_chat_model(str(model_name), 0.3)
+            result = llm.invoke(_build_prompt(state, query))
             reply = getattr(result, "content", None) or None
         except Exception:
             reply = None
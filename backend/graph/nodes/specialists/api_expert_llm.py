@@ -11,9 +11,9 @@ import logging
 from typing import Any
 
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
 
 from backend.app.core.config import get_settings
+from backend.app.services.llm_service import get_chat_model
 from backend.prompts.loader import get_prompt
 
 logger = logging.getLogger(__name__)
@@ -61,7 +61,7 @@ def api_expert_node(state: dict[str, Any]) -> dict[str, Any]:
 
     try:
         # Call LLM (synchronous)
-        llm = ChatOpenAI(model=settings.OPENAI_MODEL, temperature=0.2, timeout=30.0)
+        llm = get_chat_model(settings.OPENAI_MODEL, 0.2, timeout=30.0)
         messages = [
             SystemMessage(content="You are an API design expert. Always output valid JSON."),
             HumanMessage(content=prompt_text),
@@ -10,17 +10,12 @@ import json
 import logging
 from typing import Any
 
+from langchain_core.messages import HumanMessage, SystemMessage
+
 from backend.app.core.config import get_settings
+from backend.app.services.llm_service import get_chat_model
 from backend.prompts.loader import get_prompt
 
-try:
-    from langchain_core.messages import HumanMessage, SystemMessage
-    from langchain_openai import ChatOpenAI
-except Exception:  # pragma: no cover
-    ChatOpenAI = None
-    SystemMessage = None
-    HumanMessage = None
-
 logger = logging.getLogger(__name__)
 
 
@@ -44,7 +39,7 @@ def db_expert_node(state: dict[str, Any]) -> dict[str, Any]:
     default_analysis = {"queries": [], "risks": [], "optimizations": []}
 
     # Check if we have OpenAI configured
-    if not settings.OPENAI_API_KEY or ChatOpenAI is None:
+    if not settings.OPENAI_API_KEY:
         logger.warning("DB expert: OpenAI not configured, skipping LLM analysis")
         return {"db_expert_analysis": default_analysis}
 
@@ -59,7 +54,7 @@ def db_expert_node(state: dict[str, Any]) -> dict[str, Any]:
 
     try:
         # Call LLM (synchronous)
-        llm = ChatOpenAI(model=settings.OPENAI_MODEL, temperature=0.2, timeout=30.0)
+        llm = get_chat_model(settings.OPENAI_MODEL, 0.2, timeout=30.0)
         messages = [
             SystemMessage(content="You are a database expert. Always output valid JSON."),
             HumanMessage(content=prompt_text),
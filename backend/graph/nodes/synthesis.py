@@ -10,9 +10,9 @@ import json
 from typing import Any
 
 from langchain_core.messages import HumanMessage, SystemMessage  # type: ignore
-from langchain_openai import ChatOpenAI  # type: ignore
 
 from backend.app.core.config import get_settings
+from backend.app.services.llm_service import get_chat_model
 from backend.prompts.loader import get_prompt
 
 SYNTHESIS_SYSTEM_PROMPT = (
@@ -25,6 +25,9 @@ CHAT_SYSTEM_PROMPT = (
     "Avoid repeating content you've already sent earlier in this thread; add new value or be brief."
 )
 
+# Report section title per requested specialist agent.
+_AGENT_SECTIONS = {"quality": "Quality", "bug": "Bugs", "security": "Security"}
+
 
 def _messages_from_state(state: dict[str, Any]) -> list[Any]:
     sections = {
@@ -53,15 +56,8 @@ def _messages_from_state(state: dict[str, Any]) -> list[Any]:
             ),
         ]
     else:
-        section_names: list[str] = []
         if mode == "specialists":
-            for a in agents:
-                if a == "quality":
-                    section_names.append("Quality")
-                if a == "bug":
-                    section_names.append("Bugs")
-                if a == "security":
-                    section_names.append("Security")
+            section_names = [_AGENT_SECTIONS[a] for a in agents if a in _AGENT_SECTIONS]
         else:
             section_names = ["Security", "Quality", "Bugs"]
         guidance = (
@@ -190,7 +186,7 @@ def synthesis_node(state: dict[str, Any]) -> dict[str, Any]:
     if settings.OPENAI_API_KEY:
         try:
             model_name = state.get("llm_model") or settings.OPENAI_MODEL
-            llm = ChatOpenAI(model=str(model_name), temperature=0.2)
+            llm = get_chat_model(str(model_name), 0.2)
             messages = _messages_from_state(state)
             result = llm.invoke(messages)
             final_text = getattr(result, "content", None) or None
@@ -34,3 +34,152 @@ def test_explain_streaming_fallback_markdown(app, monkeypatch) -> None:
     assert "# Code Review" in body
     # Some section content
     assert "## Security" in body or "## Quality" in body
+
+
+def test_explain_json_mode(app, monkeypatch) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    client = TestClient(app)
+    payload = {"code": "def f(x):\n    return eval(x)", "thread_id": "test-thread-json"}
+    r = client.post("/explain?stream=0", json=payload)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/json")
+    data = r.json()
+    assert data["thread_id"] == "test-thread-json"
+    assert "# Code Review" in data["final_report"]
+
+
+def test_chat_streams_reply_once(app, monkeypatch) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    client = TestClient(app)
+    payload = {
+        "mode": "chat",
+        "thread_id": "test-chat-1",
+        "messages": [{"role": "user", "content": "What are the main risks?"}],
+    }
+    with client.stream("POST", "/chat", json=payload) as r:
+        assert r.status_code == 200
+        body = "".join(chunk for chunk in r.iter_text() if chunk)
+
+    # Deterministic non-LLM reply, emitted once and followed by the done marker
+    assert body.count("Question: What are the main risks?") == 1
+    assert body.rstrip().endswith("data: :::done")
+
+
+class _FakeStreamingGraph:
+    """Graph stand-in whose astream yields LLM tokens for ``node``, then ``final``."""
+
+    def __init__(self, node: str, tokens: list[str], final: dict) -> None:
+        self.node = node
+        self.tokens = tokens
+        self.final = final
+
+    async def astream(self, state, config=None, stream_mode=None):
+        from langchain_core.messages import AIMessageChunk
+
+        for token in self.tokens:
+            yield "messages", (AIMessageChunk(content=token), {"langgraph_node": self.node})
+        yield "values", self.final
+
+
+def _client_payloads(body: str) -> list[str]:
+    """Reassemble SSE events the way the frontend parsers do (control frames dropped)."""
+    payloads: list[str] = []
+    for event in body.split("\n\n"):
+        lines = [ln[5:].lstrip() for ln in event.split("\n") if ln.startswith("data:")]
+        payload = "\n".join(lines)
+        if payload and not payload.startswith(":::"):
+            payloads.append(payload)
+    return payloads
+
+
+def test_chat_token_stream_is_framed_by_paragraph(app, monkeypatch) -> None:
+    reply = "First paragraph,\nstill first.\n\nSecond  one with spaced tokens.\n\nLast."
+    tokens = [
+        "First",
+        " paragraph",
+        ",\n",
+        "still first.",
+        "\n",
+        "\nSecond ",
+        " one",
+        " with",
+        " spaced",
+        " tokens.\n\n",
+        "Last",
+        ".",
+    ]
+    assert "".join(tokens) == reply
+    monkeypatch.setattr(
+        app.state, "graph_app", _FakeStreamingGraph("chat_reply", tokens, {"chat_response": reply})
+    )
+
+    client = TestClient(app)
+    payload = {
+        "mode": "chat",
+        "thread_id": "test-chat-tokens",
+        "messages": [{"role": "user", "content": "Summarize?"}],
+    }
+    with client.stream("POST", "/chat", json=payload) as r:
+        assert r.status_code == 200
+        body = "".join(chunk for chunk in r.iter_text() if chunk)
+
+    assert "\n\n".join(_client_payloads(body)) == reply
+
+
+def _report_payloads(app, monkeypatch, tokens: list[str], final_report: str) -> list[str]:
+    monkeypatch.setattr(
+        app.state,
+        "graph_app",
+        _FakeStreamingGraph("synthesis", tokens, {"final_report": final_report, "progress": 90}),
+    )
+    client = TestClient(app)
+    with client.stream("POST", "/explain", json={"code": "x = 1"}) as r:
+        assert r.status_code == 200
+        body = "".join(chunk for chunk in r.iter_text() if chunk)
+    # Drop the closing "Chat ready" note
+    return [p for p in _client_payloads(body) if not p.startswith("💬")]
+
+
+def test_explain_streams_report_paragraphs_once(app, monkeypatch) -> None:
+    report = "# Code Review\n\n## Quality\n- Line 1: ok\n\n## Bugs\n- none"
+    tokens = ["# Code", " Review\n", "\n## Quality\n- Line 1", ": ok\n\n", "## Bugs\n- none"]
+    payloads = _report_payloads(app, monkeypatch, tokens, report)
+    assert "\n\n".join(payloads) == report
+
+
+def test_explain_mid_stream_fallback_replaces_partial_report(app, monkeypatch) -> None:
+    # LLM streamed two paragraphs then failed; synthesis fell back to markdown
+    tokens = ["## Draft\n\n", "Partial point one.\n\n", "Partial po"]
+    fallback = "# Code Review\n\n## Quality\nBlocks analyzed: 1\n\n## Bugs"
+    payloads = _report_payloads(app, monkeypatch, tokens, fallback)
+
+    assert payloads[:2] == ["## Draft", "Partial point one."]
+    assert payloads[2].startswith("⚠️ Streaming was interrupted")
+    assert "\n\n".join(payloads[3:]) == fallback
+
+
+def test_threads_endpoints_encode_json(app) -> None:
+    import warnings
+
+    from fastapi.exceptions import FastAPIDeprecationWarning
+
+    client = TestClient(app)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        r = client.get("/threads")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/json")
+    assert isinstance(r.json(), list)
+    assert not [w for w in caught if issubclass(w.category, FastAPIDeprecationWarning)]
+
+
+def test_upload_skips_files_over_the_size_cap(app) -> None:
+    from backend.app.core.config import get_settings
+
+    too_big = b"x" * (get_settings().MAX_UPLOAD_BYTES + 1)
+    client = TestClient(app)
+    r = client.post("/explain/upload", files={"files": ("big.py", too_big, "text/plain")})
+    assert r.status_code == 200
+    assert "No valid text files found." in r.text
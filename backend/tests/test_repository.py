@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db.models import Base, Thread
+from backend.app.db.repository import ThreadRepository
+
+
+@pytest.fixture()
+def sqlite_repo():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield ThreadRepository(session)
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_upsert_inserts_new_thread(sqlite_repo) -> None:
+    sqlite_repo.upsert_thread("t-new", title="Fresh", report_text="r", state={"a": 1}, file_count=2)
+
+    th = sqlite_repo.get_thread("t-new")
+    assert (th.title, th.report_text, th.state_json, th.file_count) == ("Fresh", "r", {"a": 1}, 2)
+
+
+def test_upsert_updates_existing_thread_keeping_title_and_created_at(sqlite_repo) -> None:
+    created = sqlite_repo.create_thread("t-1", title="Original")
+    created_at = created.created_at
+    sqlite_repo.upsert_thread("t-1", title="Ignored", report_text="old", state={"v": 1})
+
+    sqlite_repo.upsert_thread("t-1", title="Ignored", report_text="new", state={"v": 2})
+
+    db = sqlite_repo.db
+    db.expire_all()
+    th = db.get(Thread, "t-1")
+    assert th.title == "Original"
+    assert th.created_at == created_at
+    assert th.report_text == "new"
+    assert th.state_json == {"v": 2}
+    assert db.query(Thread).count() == 1
+
+
+def test_upsert_without_native_upsert_uses_title(sqlite_repo, monkeypatch) -> None:
+    monkeypatch.setattr(sqlite_repo.db.get_bind().dialect, "name", "other")
+
+    sqlite_repo.upsert_thread("t-other", title="Fresh", report_text="r", file_count=3)
+    sqlite_repo.upsert_thread("t-other", title="Ignored", report_text="r2")
+
+    th = sqlite_repo.get_thread("t-other")
+    assert (th.title, th.report_text, th.file_count) == ("Fresh", "r2", 3)
+
+
+def test_upsert_in_memory_keeps_title() -> None:
+    repo = ThreadRepository()
+    if repo._get_session() is not None:
+        pytest.skip("persistence is enabled (DATABASE_URL set)")
+    repo.create_thread("t-mem-upsert", title="Memory")
+
+    repo.upsert_thread("t-mem-upsert", title="Ignored", report_text="r", state={"k": "v"})
+
+    th = repo.get_thread("t-mem-upsert")
+    assert (th.title, th.report_text, th.state_json) == ("Memory", "r", {"k": "v"})
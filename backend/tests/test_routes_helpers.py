@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import io
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from backend.app.api.routes import (
+    _UPLOAD_CHUNK_BYTES,
+    _first_fenced_block,
+    _read_upload_text,
+    coalesce_frames,
+)
+
+
+def test_fenced_block_with_language_tag() -> None:
+    text = "Please review:\n\n```python\ndef add(a, b):\n    return a + b\n```\nThanks"
+    assert _first_fenced_block(text) == "def add(a, b):\n    return a + b"
+
+
+def test_fenced_block_body_with_backticks() -> None:
+    text = "```js\nconst s = `x` + ``y``;\n```"
+    assert _first_fenced_block(text) == "const s = `x` + ``y``;"
+
+
+def test_unterminated_fence_has_no_block() -> None:
+    assert _first_fenced_block("```python\ndef f():\n    return 1\n" + "`" * 2 + "x" * 5000) == ""
+
+
+def test_no_fence() -> None:
+    assert _first_fenced_block("just a question about `f`") == ""
+
+
+def test_coalesce_frames_preserves_order_and_caps_batches() -> None:
+    frames = [f"data: {i}\n\n" for i in range(40)]
+
+    async def source():
+        for f in frames:
+            yield f
+
+    async def run() -> list[str]:
+        return [b async for b in coalesce_frames(source(), window=1.0, max_frames=16)]
+
+    batches = asyncio.run(run())
+    assert "".join(batches) == "".join(frames)
+    assert [b.count("data:") for b in batches] == [16, 16, 8]
+
+
+def test_coalesce_frames_forwards_source_errors() -> None:
+    async def source():
+        yield "a"
+        yield "b"
+        raise ValueError("boom")
+
+    async def run() -> list[str]:
+        got: list[str] = []
+        with pytest.raises(ValueError, match="boom"):
+            async for b in coalesce_frames(source(), window=0.01):
+                got.append(b)
+        return got
+
+    assert "".join(asyncio.run(run())) == "ab"
+
+
+def test_coalesce_frames_cancels_pump_when_consumer_stops() -> None:
+    cancelled = asyncio.Event()
+
+    async def source():
+        try:
+            while True:
+                yield "x"
+                await asyncio.sleep(0.001)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def run() -> None:
+        stream = coalesce_frames(source(), window=0.01)
+        assert (await anext(stream)).startswith("x")
+        await stream.aclose()
+        assert cancelled.is_set()
+
+    asyncio.run(run())
+
+
+def _read(data: bytes, max_bytes: int, size: int | None = None) -> str | None:
+    upload = UploadFile(file=io.BytesIO(data), filename="f.py", size=size)
+    return asyncio.run(_read_upload_text(upload, max_bytes))
+
+
+def test_upload_over_cap_is_rejected() -> None:
+    data = b"x" * (3 * _UPLOAD_CHUNK_BYTES)
+    # Rejected while streaming when the size is unknown, and up front when known
+    assert _read(data, max_bytes=len(data) - 1) is None
+    assert _read(data, max_bytes=len(data) - 1, size=len(data)) is None
+    assert _read(data, max_bytes=len(data)) == data.decode()
+
+
+def test_upload_multibyte_char_split_across_chunks() -> None:
+    text = "a" * (_UPLOAD_CHUNK_BYTES - 1) + "é€" + "z"
+    data = text.encode("utf-8")
+    # "é" starts on the last byte of the first chunk
+    assert data[_UPLOAD_CHUNK_BYTES - 1 : _UPLOAD_CHUNK_BYTES + 1] == "é".encode()
+    assert _read(data, max_bytes=len(data)) == text
+
+
+def test_upload_invalid_bytes_are_replaced() -> None:
+    assert _read(b"ok\xffok", max_bytes=100) == "ok\ufffdok"
+
+
+def test_safe_state_coerces_odd_keys_without_dropping_state() -> None:
+    from backend.app.api.routes import _safe_state_for_db
+
+    state = {
+        "final_report": "# Code Review",
+        "context": {("a.py", 1): "tuple key", "ratio": 1 + 2j},
+        "files": [{"path": "a.py", "content": "x"}],
+        "not_persisted": object(),
+    }
+    safe = _safe_state_for_db(state)
+    assert safe["final_report"] == "# Code Review"
+    assert safe["files"] == [{"path": "a.py", "content": "x"}]
+    assert safe["context"] == {"('a.py', 1)": "tuple key", "ratio": "(1+2j)"}
+    assert "not_persisted" not in safe
+
+
+def test_admin_db_info_is_memoized_with_ttl(monkeypatch) -> None:
+    from types import SimpleNamespace
+
+    from backend.app.api import routes
+
+    calls: list[int] = []
+    clock = [1000.0]
+
+    def fake_collect() -> dict:
+        calls.append(1)
+        return {"database_url": "", "alembic_head": str(len(calls)), "tables": []}
+
+    monkeypatch.setattr(routes, "_collect_db_info", fake_collect)
+    monkeypatch.setattr(routes, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    monkeypatch.setattr(routes, "_db_info_cache", None)
+
+    assert asyncio.run(routes.db_info())["alembic_head"] == "1"
+    clock[0] += routes._DB_INFO_TTL_S - 1
+    assert asyncio.run(routes.db_info())["alembic_head"] == "1"  # cache hit
+    assert len(calls) == 1
+    clock[0] += 2
+    assert asyncio.run(routes.db_info())["alembic_head"] == "2"  # expired, re-queried
+    assert len(calls) == 2